@@ -18,6 +18,13 @@ class Config:
     HOST: str = os.getenv('HOST', '0.0.0.0')
     PORT: int = int(os.getenv('PORT', '8000'))
     
+    # Seconds to cache the full movie library listing between refetches
+    MOVIE_CACHE_TTL: float = float(os.getenv('MOVIE_CACHE_TTL', '300'))
+    
+    # Reload every movie's full metadata (complete cast, all genres) when
+    # filling the cache; costs one Plex request per movie, run concurrently
+    PREFETCH_FULL_METADATA: bool = os.getenv('PREFETCH_FULL_METADATA', 'false').lower() in ('1', 'true', 'yes')
+    
     # Logging
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     
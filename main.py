@@ -7,14 +7,17 @@ import psutil
 import time
 from datetime import datetime
 import asyncio
-import json
+import itertools
 import logging
-import uuid
+from collections import deque
 from contextlib import asynccontextmanager
 
+import orjson
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sse_starlette import EventSourceResponse
+from sse_starlette.sse import ServerSentEvent
 import uvicorn
 
 from config import config, Config
@@ -28,16 +31,85 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Store for SSE connections and message queues
-connections = {}
-message_queues = {}
+# Seconds between SSE keepalive pings on idle connections
+KEEPALIVE_INTERVAL = 15
+
+# Number of recent broadcast messages retained for slow SSE clients
+BROADCAST_BUFFER_SIZE = 256
+
+class BroadcastRing:
+    """Bounded append-only buffer shared by all SSE clients
+    
+    Publishing is O(1) regardless of client count; each reader keeps its own
+    sequence index and skips ahead (dropping messages) if it falls further
+    behind than the buffer holds, so slow clients never block the producer.
+    """
+    
+    def __init__(self, maxlen: int):
+        self._ring = deque(maxlen=maxlen)
+        self._tail = 0  # Sequence number of the next message to publish
+        self._cond = None
+        self.subscribers = 0
+    
+    def subscribe(self) -> int:
+        """Register a reader; returns the sequence number it starts reading from"""
+        self.subscribers += 1
+        return self._tail
+    
+    def unsubscribe(self) -> None:
+        """Unregister a reader, releasing buffered messages once none remain"""
+        self.subscribers -= 1
+        if not self.subscribers:
+            self._ring.clear()
+    
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+    
+    async def publish(self, message) -> None:
+        """Append a message and wake all waiting readers"""
+        cond = self._condition()
+        async with cond:
+            self._ring.append(message)
+            self._tail += 1
+            cond.notify_all()
+    
+    async def read_from(self, index: int):
+        """Wait for messages at or after ``index``
+        
+        Returns ``(next_index, messages, dropped)``.
+        """
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: index < self._tail)
+            head = self._tail - len(self._ring)
+            dropped = max(0, head - index)
+            start = max(index, head)
+            messages = list(itertools.islice(self._ring, start - head, None))
+            return self._tail, messages, dropped
+
+# Pre-encoded connection established message sent to every new SSE client
+INITIALIZED_PAYLOAD = orjson.dumps({
+    "jsonrpc": "2.0",
+    "method": "notifications/initialized",
+    "params": {}
+}).decode()
+
+# SSE client ids and the shared broadcast buffer
+_next_client_id = itertools.count().__next__
+broadcast = BroadcastRing(BROADCAST_BUFFER_SIZE)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     Config.validate()
-    logger.info(f"Connected to Plex server: {plex_client.server_name}")
+    # Connect to Plex in a worker thread so the event loop isn't blocked
+    loop = asyncio.get_running_loop()
+    server_name = await loop.run_in_executor(None, lambda: plex_client.server_name)
+    logger.info(f"Connected to Plex server: {server_name}")
     logger.info(f"Starting Plex MCP Server on {config.HOST}:{config.PORT}")
     
     yield
@@ -50,6 +122,7 @@ app = FastAPI(
     title="Plex MCP Server",
     description="Model Context Protocol server for Plex media management",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -79,63 +152,53 @@ async def health():
 @app.get("/sse")
 async def sse_endpoint(request: Request):
     """SSE endpoint for MCP connections"""
-    client_id = str(uuid.uuid4())
-    message_queues[client_id] = asyncio.Queue()
+    client_id = _next_client_id()
     
     logger.info(f"New SSE connection: {client_id}")
     
     async def event_stream():
+        # Subscribe before the first yield so responses published while the
+        # greeting is being sent are still delivered
+        index = broadcast.subscribe()
         try:
             # Send initial connection established message
-            yield {
-                "data": json.dumps({
-                    "jsonrpc": "2.0",
-                    "method": "notifications/initialized",
-                    "params": {}
-                })
-            }
+            yield {"data": INITIALIZED_PAYLOAD}
             
-            # Listen for messages in the queue
+            # Follow the broadcast buffer; idle keepalives are sent by
+            # EventSourceResponse as SSE comment pings
             while True:
-                try:
-                    # Wait for messages with timeout
-                    message = await asyncio.wait_for(
-                        message_queues[client_id].get(),
-                        timeout=30.0
-                    )
-                    yield {"data": json.dumps(message)}
-                except asyncio.TimeoutError:
-                    # Send keepalive
-                    yield {"data": "keepalive"}
+                index, messages, dropped = await broadcast.read_from(index)
+                if dropped:
+                    logger.warning(f"SSE client {client_id} fell behind, dropped {dropped} messages")
+                if len(messages) == 1:
+                    yield {"data": messages[0]}
+                else:
+                    # Coalesce a backlog into one write; bytes are sent as-is,
+                    # so clients still see ordinary per-message events
+                    yield b"".join(ServerSentEvent(data=payload).encode() for payload in messages)
                     
         except asyncio.CancelledError:
             logger.info(f"SSE connection closed: {client_id}")
         finally:
-            # Cleanup
-            if client_id in message_queues:
-                del message_queues[client_id]
-            if client_id in connections:
-                del connections[client_id]
+            # Cleanup runs on every exit path, including generator close
+            broadcast.unsubscribe()
     
-    connections[client_id] = request
-    return EventSourceResponse(event_stream())
+    return EventSourceResponse(event_stream(), ping=KEEPALIVE_INTERVAL)
 
 @app.post("/sse")
 async def sse_post_endpoint(request: Request):
     """Handle POST requests to SSE endpoint (for mcp-remote compatibility)"""
     try:
         message = await request.json()
-        logger.debug(f"Received POST to /sse: {message}")
+        logger.debug("Received POST to /sse: %s", message)
         
         # Handle the message using MCP handler
-        response = mcp_handler.handle_message(message)
+        response = await mcp_handler.handle_message(message)
         
-        # If there are active connections, send the response via SSE
-        for client_id in list(message_queues.keys()):
-            try:
-                await message_queues[client_id].put(response)
-            except Exception as e:
-                logger.error(f"Error sending to client {client_id}: {e}")
+        # If there are active connections, send the response via SSE,
+        # encoded once and shared by every client
+        if broadcast.subscribers:
+            await broadcast.publish(orjson.dumps(response).decode())
         
         # Also return the response directly
         return response
@@ -153,10 +216,10 @@ async def handle_messages(request: Request):
     """Handle MCP messages (alternative endpoint)"""
     try:
         message = await request.json()
-        logger.debug(f"Received message: {message}")
+        logger.debug("Received message: %s", message)
         
-        response = mcp_handler.handle_message(message)
-        logger.debug(f"Sending response: {response}")
+        response = await mcp_handler.handle_message(message)
+        logger.debug("Sending response: %s", response)
         
         return response
         
@@ -178,8 +241,9 @@ async def detailed_status():
     
     try:
         # Get basic library stats
-        section = plex_client.get_movie_library()
-        movie_count = len(section.all())
+        loop = asyncio.get_running_loop()
+        movies = await loop.run_in_executor(None, plex_client.get_all_movies_cached)
+        movie_count = len(movies)
     except:
         movie_count = "Unknown"
     
@@ -198,8 +262,7 @@ async def detailed_status():
             "memory_percent": psutil.virtual_memory().percent,
             "disk_percent": psutil.disk_usage('/').percent
         },
-        "active_connections": len(connections),
-        "message_queues": len(message_queues)
+        "active_connections": broadcast.subscribers
     }
 
 @app.get("/status/simple")
@@ -217,5 +280,8 @@ if __name__ == "__main__":
         host=config.HOST,
         port=config.PORT,
         reload=False,
+        # "auto" selects uvloop and httptools when installed (see requirements.txt)
+        loop="auto",
+        http="auto",
         log_level=config.LOG_LEVEL.lower()
     )
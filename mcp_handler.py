@@ -1,13 +1,25 @@
 """MCP message handling and routing"""
 
+import asyncio
+import functools
 import logging
 from typing import Dict, Any
 
+import orjson
+
 from tools import MovieTools
 from tools.tv_tools import TVTools
 
 logger = logging.getLogger(__name__)
 
+def serialize_response(obj: Any) -> str:
+    """Encode a tool result as JSON text
+    
+    Tool results are expected to hold only str keys and JSON-native values
+    (datetimes as ISO strings); anything else falls back to str().
+    """
+    return orjson.dumps(obj, default=str).decode()
+
 class MCPHandler:
     """Handle MCP JSON-RPC messages"""
     
@@ -18,6 +30,11 @@ class MCPHandler:
         # Build tool registry
         self.tools = {}
         self._register_tools()
+        
+        # Tool definitions are static, so build the tools/list result once
+        self._tools_list_result = {
+            "tools": MovieTools.get_tool_definitions() + TVTools.get_tool_definitions()
+        }
     
     def _register_tools(self):
         """Register all available tools"""
@@ -44,7 +61,7 @@ class MCPHandler:
         # tv_methods = {...}
         # self.tools.update(tv_methods)
     
-    def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Handle MCP JSON-RPC messages"""
         try:
             method = message.get("method")
@@ -58,7 +75,7 @@ class MCPHandler:
             elif method == "tools/list":
                 return self._handle_tools_list(msg_id)
             elif method == "tools/call":
-                return self._handle_tools_call(msg_id, params)
+                return await self._handle_tools_call(msg_id, params)
             else:
                 return {
                     "jsonrpc": "2.0",
@@ -93,24 +110,22 @@ class MCPHandler:
     
     def _handle_tools_list(self, msg_id: int) -> Dict[str, Any]:
         """Handle tools/list message"""
-        tools = []
-        tools.extend(MovieTools.get_tool_definitions())
-        tools.extend(TVTools.get_tool_definitions())
-        
         return {
             "jsonrpc": "2.0",
             "id": msg_id,
-            "result": {"tools": tools}
+            "result": self._tools_list_result
         }
     
-    def _handle_tools_call(self, msg_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_tools_call(self, msg_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tools/call message"""
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
         
-        logger.info(f"Calling tool: {tool_name} with args: {arguments}")
+        # Lazy %-formatting skips building the argument string unless DEBUG is on
+        logger.debug("Calling tool: %s with args: %s", tool_name, arguments)
         
-        if tool_name not in self.tools:
+        tool_method = self.tools.get(tool_name)
+        if tool_method is None:
             return {
                 "jsonrpc": "2.0",
                 "id": msg_id,
@@ -118,9 +133,9 @@ class MCPHandler:
             }
         
         try:
-            # Call the tool method
-            tool_method = self.tools[tool_name]
-            result = tool_method(**arguments)
+            # Call the tool method in a worker thread; plexapi calls block on HTTP
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, functools.partial(tool_method, **arguments))
             
             return {
                 "jsonrpc": "2.0",
@@ -129,7 +144,7 @@ class MCPHandler:
                     "content": [
                         {
                             "type": "text",
-                            "text": f"{result}"
+                            "text": serialize_response(result)
                         }
                     ]
                 }
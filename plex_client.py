@@ -1,7 +1,16 @@
 """Plex server client and connection management"""
 
 import logging
-from typing import Optional
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from typing import AbstractSet, Dict, FrozenSet, List, Optional, Set, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from plexapi.server import PlexServer
 from plexapi.exceptions import PlexApiException
 
@@ -9,17 +18,216 @@ from config import config
 
 logger = logging.getLogger(__name__)
 
+# Concurrent requests used when prefetching full movie metadata
+PREFETCH_WORKERS = 16
+
+# Extra arguments for library listings and searches. plexapi asks Plex to
+# embed every item's external guids (imdb://, tmdb://, ...) by default; no
+# tool reads them, so leave them out of the XML
+LIGHT_SEARCH_ARGS = {'includeGuids': False}
+
+_NO_MOVIES: FrozenSet[int] = frozenset()
+
+class TagTable:
+    """Interned vocabulary for one kind of tag (genre, director, actor)
+    
+    Each distinct tag gets an integer id. ``rows`` holds the tag ids of every
+    movie by position and ``postings`` the movie positions of every tag id.
+    """
+    
+    def __init__(self):
+        self.ids: Dict[str, int] = {}        # Casefolded tag -> id
+        self.names: List[str] = []           # Id -> tag as shown in Plex
+        self.plex_ids: List[Optional[int]] = []  # Id -> Plex's own tag id
+        self.postings: List[Set[int]] = []   # Id -> positions of movies carrying it
+        self.rows: List[Tuple[int, ...]] = []  # Movie position -> tag ids
+    
+    def add_row(self, tags) -> None:
+        """Append the next movie's tags"""
+        i = len(self.rows)
+        row = []
+        for tag in tags or ():
+            key = tag.tag.casefold()
+            tag_id = self.ids.get(key)
+            if tag_id is None:
+                tag_id = self.ids[key] = len(self.names)
+                self.names.append(tag.tag)
+                self.plex_ids.append(getattr(tag, 'id', None))
+                self.postings.append(set())
+            self.postings[tag_id].add(i)
+            row.append(tag_id)
+        self.rows.append(tuple(row))
+    
+    def lookup(self, name: str) -> AbstractSet[int]:
+        """Positions of movies carrying ``name`` (case-insensitive)"""
+        tag_id = self.ids.get(name.casefold())
+        return self.postings[tag_id] if tag_id is not None else _NO_MOVIES
+    
+    def plex_id(self, name: str) -> Optional[int]:
+        """Plex's tag id for ``name`` (case-insensitive), if known"""
+        tag_id = self.ids.get(name.casefold())
+        return self.plex_ids[tag_id] if tag_id is not None else None
+    
+    @cached_property
+    def masks(self) -> List[int]:
+        """Per-movie bitmask of tag ids (bit n set if the movie has tag n)"""
+        masks = []
+        for row in self.rows:
+            mask = 0
+            for tag_id in row:
+                mask |= 1 << tag_id
+            masks.append(mask)
+        return masks
+    
+    def counts(self) -> Counter:
+        """Number of movies per tag name"""
+        return Counter({name: len(ids) for name, ids in zip(self.names, self.postings)})
+
+class MovieIndex:
+    """Derived lookups over a movie listing, built once per cache refresh
+    
+    Per-movie fields are stored as parallel lists (struct of arrays) indexed
+    by the movie's position in ``movies``, so scans don't touch plexapi objects.
+    """
+    
+    def __init__(self, movies: list):
+        self.movies = movies
+        self.titles: List[str] = []
+        self.years: List[int] = []  # -1 marks movies without a year
+        self.ratings: List[Optional[float]] = []
+        self.genres = TagTable()
+        self.directors = TagTable()
+        self.actors = TagTable()
+        self.decade_index: Dict[int, Set[int]] = {}
+        # Casefolded title -> position (first movie wins on duplicate titles)
+        self.title_index: Dict[str, int] = {}
+        # ratingKey -> position
+        self.positions: Dict[int, int] = {}
+        # (ratingKey, summary length) -> formatted result dict, filled lazily
+        self.serialized: Dict[Tuple[int, int], Dict] = {}
+        
+        for i, movie in enumerate(movies):
+            # Read loaded attributes directly so empty values don't trigger
+            # a plexapi reload per movie
+            attrs = movie.__dict__
+            year = attrs.get('year') or -1
+            self.titles.append(movie.title)
+            self.title_index.setdefault(movie.title.casefold(), i)
+            self.positions[movie.ratingKey] = i
+            self.years.append(year)
+            self.ratings.append(attrs.get('rating'))
+            self.genres.add_row(attrs.get('genres'))
+            self.directors.add_row(attrs.get('directors'))
+            self.actors.add_row(attrs.get('roles'))
+            if year > 0:
+                self.decade_index.setdefault((year // 10) * 10, set()).add(i)
+        
+        # Year-sorted view for bisecting year ranges
+        by_year = sorted((year, i) for i, year in enumerate(self.years))
+        self.years_sorted: List[int] = [year for year, _ in by_year]
+        self.idx_sorted: List[int] = [i for _, i in by_year]
+        self.latest_added_at = max(
+            (movie.addedAt for movie in movies if movie.__dict__.get('addedAt')),
+            default=None
+        )
+    
+    # Library-wide counts are the posting set sizes gathered during the single
+    # build pass, so no per-movie counting is needed; they are only derived
+    # on first use since most cache refreshes never serve library stats
+    @cached_property
+    def genre_counts(self) -> Counter:
+        return self.genres.counts()
+    
+    @cached_property
+    def director_counts(self) -> Counter:
+        return self.directors.counts()
+    
+    @cached_property
+    def decade_counts(self) -> Counter:
+        return Counter({f"{decade}s": len(ids) for decade, ids in self.decade_index.items()})
+    
+    def year(self, i: int) -> Optional[int]:
+        """Release year of the movie at position ``i``, or None"""
+        year = self.years[i]
+        return year if year > 0 else None
+    
+    def year_range_ids(self, start_year: int, end_year: int) -> List[int]:
+        """Positions of movies released in [start_year, end_year], in year order"""
+        lo = bisect_left(self.years_sorted, max(start_year, 1))  # Skip the -1 "no year" sentinel
+        hi = bisect_right(self.years_sorted, end_year)
+        return self.idx_sorted[lo:hi]
+
+class _MovieCache:
+    """Process-local TTL cache of movie library listings, keyed by section"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # section key -> (expiry timestamp, index)
+        self._entries: Dict[str, Tuple[float, MovieIndex]] = {}
+    
+    def peek(self, key: str) -> Optional[MovieIndex]:
+        """Return the cached index for ``key`` if fresh, without refreshing"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+    
+    def get(self, key: str, loader) -> MovieIndex:
+        """Return the cached index, calling ``loader`` to refetch movies when stale"""
+        index = self.peek(key)
+        if index is not None:
+            return index
+        
+        # Single-flight: concurrent callers wait for one refresh
+        with self._lock:
+            index = self.peek(key)
+            if index is None:
+                index = MovieIndex(loader())
+                self._entries[key] = (time.monotonic() + self.ttl, index)
+            return index
+    
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop cached movies for ``key`` (or every section) so the next access refetches"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
 class PlexClient:
     """Plex server client wrapper"""
     
     def __init__(self):
         self._server: Optional[PlexServer] = None
-        self._connect()
+        self._movie_section = None
+        self._tv_section = None
+        self._movie_cache = _MovieCache(config.MOVIE_CACHE_TTL)
+        # ratingKey -> movie with full metadata, kept across cache refreshes
+        self._full_movies: Dict[int, object] = {}
+        self._connect_lock = threading.Lock()
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a keep-alive HTTP session pooled for concurrent tool calls
+        
+        requests already negotiates gzip via its default Accept-Encoding
+        header, so XML responses from Plex arrive compressed.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
     
     def _connect(self) -> None:
         """Connect to Plex server"""
         try:
-            self._server = PlexServer(config.PLEX_URL, config.PLEX_TOKEN)
+            self._server = PlexServer(config.PLEX_URL, config.PLEX_TOKEN, session=self._create_session())
+            self.invalidate_sections()
             logger.info(f"Connected to Plex: {self._server.friendlyName}")
         except PlexApiException as e:
             logger.error(f"Failed to connect to Plex: {e}")
@@ -27,9 +235,11 @@ class PlexClient:
     
     @property
     def server(self) -> PlexServer:
-        """Get Plex server instance"""
+        """Get Plex server instance, connecting on first use"""
         if self._server is None:
-            self._connect()
+            with self._connect_lock:
+                if self._server is None:
+                    self._connect()
         return self._server
     
     @property
@@ -37,19 +247,109 @@ class PlexClient:
         """Get Plex server friendly name"""
         return self.server.friendlyName
     
-    def get_movie_library(self):
-        """Get the first movie library section"""
+    def _find_section(self, section_type: str):
         for section in self.server.library.sections():
-            if section.type == 'movie':
+            if section.type == section_type:
                 return section
-        raise ValueError("No movie section found in Plex library")
+        return None
+    
+    def invalidate_sections(self) -> None:
+        """Forget resolved library sections so they are looked up again"""
+        self._movie_section = None
+        self._tv_section = None
+    
+    def get_movie_library(self):
+        """Get the first movie library section"""
+        if self._movie_section is None:
+            self._movie_section = self._find_section('movie')
+            if self._movie_section is None:
+                raise ValueError("No movie section found in Plex library")
+        return self._movie_section
+    
+    @staticmethod
+    def _prefetch_full_metadata(movies: list) -> list:
+        """Reload full metadata for ``movies`` concurrently, returning those that loaded
+        
+        Library listings only carry partial tags (e.g. the first few billed
+        actors). Each reload is an independent HTTP request, so running them
+        on a thread pool overlaps the network latency.
+        """
+        loaded = []
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            futures = {executor.submit(movie.reload): movie for movie in movies}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    loaded.append(futures[future])
+                except Exception as e:
+                    logger.warning(f"Failed to load full metadata for {futures[future].title}: {e}")
+        return loaded
+    
+    def _load_movies(self, section) -> list:
+        """Fetch all movies in ``section`` for the cache"""
+        movies = section.all(**LIGHT_SEARCH_ARGS)
+        if config.PREFETCH_FULL_METADATA:
+            self._reuse_full_metadata(movies)
+        return movies
+    
+    def _reuse_full_metadata(self, movies: list) -> None:
+        """Swap in full metadata for ``movies``, reloading only new or changed ones
+        
+        Movies reloaded on an earlier refresh are reused while their
+        ``updatedAt`` is unchanged, so only the first fill pays one Plex
+        request per movie.
+        """
+        previous = self._full_movies
+        full_movies = {}
+        stale = []
+        for i, movie in enumerate(movies):
+            full = previous.get(movie.ratingKey)
+            if full is not None and full.__dict__.get('updatedAt') == movie.__dict__.get('updatedAt'):
+                movies[i] = full_movies[movie.ratingKey] = full
+            else:
+                stale.append(movie)
+        
+        if stale:
+            logger.info(f"Loading full metadata for {len(stale)} of {len(movies)} movies")
+        loaded = self._prefetch_full_metadata(stale)
+        
+        # Movies gone from the library are dropped; failed reloads are retried next refresh
+        full_movies.update((movie.ratingKey, movie) for movie in loaded)
+        self._full_movies = full_movies
+    
+    def get_movie_index_cached(self) -> MovieIndex:
+        """Get the movie library index, cached for MOVIE_CACHE_TTL seconds"""
+        section = self.get_movie_library()
+        return self._movie_cache.get(section.key, lambda: self._load_movies(section))
+    
+    def peek_movie_index(self) -> Optional[MovieIndex]:
+        """Get the movie library index only if a fresh one is already cached"""
+        return self._movie_cache.peek(self.get_movie_library().key)
+    
+    def get_all_movies_cached(self) -> list:
+        """Get all movies in the movie library, cached for a short TTL"""
+        return self.get_movie_index_cached().movies
+    
+    def invalidate_movie_cache(self, added_at=None) -> None:
+        """Invalidate the movie cache
+        
+        If ``added_at`` is given, only invalidate when it is newer than
+        anything in the cached listing.
+        """
+        key = self.get_movie_library().key
+        index = self._movie_cache.peek(key)
+        if added_at is not None and index is not None and index.latest_added_at is not None \
+                and added_at <= index.latest_added_at:
+            return
+        self._movie_cache.invalidate(key)
     
     def get_tv_library(self):
         """Get the first TV library section"""
-        for section in self.server.library.sections():
-            if section.type == 'show':
-                return section
-        raise ValueError("No TV section found in Plex library")
+        if self._tv_section is None:
+            self._tv_section = self._find_section('show')
+            if self._tv_section is None:
+                raise ValueError("No TV section found in Plex library")
+        return self._tv_section
 
-# Global Plex client instance
+# Global Plex client instance (connects lazily on first use)
 plex_client = PlexClient()
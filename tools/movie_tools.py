@@ -1,13 +1,21 @@
 """Movie-related MCP tools for Plex"""
 
+import functools
+import heapq
 import logging
+import operator
+from collections import Counter, defaultdict
 from typing import Dict, Any, List
+from urllib.parse import urlencode
 from plexapi.exceptions import PlexApiException
+from plexapi import utils
 
-from plex_client import plex_client
+from plex_client import LIGHT_SEARCH_ARGS, plex_client
 
 logger = logging.getLogger(__name__)
 
+_get_tag = operator.attrgetter('tag')
+
 class MovieTools:
     """Movie-related MCP tools"""
     
@@ -171,21 +179,24 @@ class MovieTools:
     def list_all_movies(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
         """Get all movies in library with pagination"""
         try:
-            section = plex_client.get_movie_library()
-            all_movies = section.all()
-            total = len(all_movies)
-            movies = all_movies[offset:offset+limit]
+            index = plex_client.peek_movie_index()
+            if index is not None:
+                total = len(index.movies)
+                movies = index.movies[offset:offset+limit]
+            else:
+                # Cold cache: fetch only the requested window from Plex
+                section = plex_client.get_movie_library()
+                # totalSize is cached on the section object, so count afresh
+                total = section.totalViewSize(libtype='movie', includeCollections=False)
+                movies = section.search(
+                    libtype='movie',
+                    container_start=offset,
+                    container_size=limit,
+                    maxresults=limit,
+                    **LIGHT_SEARCH_ARGS
+                )
             
-            result = []
-            for movie in movies:
-                result.append({
-                    "title": movie.title,
-                    "year": getattr(movie, 'year', None),
-                    "rating": getattr(movie, 'rating', None),
-                    "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                    "directors": [d.tag for d in getattr(movie, 'directors', [])],
-                    "summary": MovieTools._truncate_summary(getattr(movie, 'summary', ''))
-                })
+            result = [MovieTools._serialize_movie(m, index, 150) for m in movies]
             
             return {
                 "movies": result,
@@ -203,17 +214,9 @@ class MovieTools:
         """Search for movies by title"""
         try:
             section = plex_client.get_movie_library()
-            results = section.search(title=query, limit=limit)
-            movies = []
-            for movie in results:
-                movies.append({
-                    "title": movie.title,
-                    "year": getattr(movie, 'year', None),
-                    "rating": getattr(movie, 'rating', None),
-                    "summary": MovieTools._truncate_summary(getattr(movie, 'summary', ''), 200),
-                    "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                    "directors": [d.tag for d in getattr(movie, 'directors', [])]
-                })
+            results = section.search(title=query, limit=limit, **LIGHT_SEARCH_ARGS)
+            index = plex_client.peek_movie_index()
+            movies = [MovieTools._serialize_movie(m, index, 200) for m in results]
             return {"movies": movies, "total": len(movies)}
         except Exception as e:
             logger.error(f"Error searching movies: {e}")
@@ -224,16 +227,9 @@ class MovieTools:
         """Find movies by genre"""
         try:
             section = plex_client.get_movie_library()
-            results = section.search(genre=genre, limit=limit)
-            movies = []
-            for movie in results:
-                movies.append({
-                    "title": movie.title,
-                    "year": getattr(movie, 'year', None),
-                    "rating": getattr(movie, 'rating', None),
-                    "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                    "directors": [d.tag for d in getattr(movie, 'directors', [])]
-                })
+            index = plex_client.peek_movie_index()
+            results = MovieTools._search_by_tag(section, index and index.genres, 'genre', genre, limit)
+            movies = [MovieTools._serialize_movie(m, index) for m in results]
             return {"movies": movies, "genre": genre, "total": len(movies)}
         except Exception as e:
             logger.error(f"Error searching by genre: {e}")
@@ -244,16 +240,9 @@ class MovieTools:
         """Find movies by director"""
         try:
             section = plex_client.get_movie_library()
-            results = section.search(director=director, limit=limit)
-            movies = []
-            for movie in results:
-                movies.append({
-                    "title": movie.title,
-                    "year": getattr(movie, 'year', None),
-                    "rating": getattr(movie, 'rating', None),
-                    "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                    "directors": [d.tag for d in getattr(movie, 'directors', [])]
-                })
+            index = plex_client.peek_movie_index()
+            results = MovieTools._search_by_tag(section, index and index.directors, 'director', director, limit)
+            movies = [MovieTools._serialize_movie(m, index) for m in results]
             return {"movies": movies, "director": director, "total": len(movies)}
         except Exception as e:
             logger.error(f"Error searching by director: {e}")
@@ -263,21 +252,21 @@ class MovieTools:
     def search_by_year_range(start_year: int, end_year: int, limit: int = 30) -> Dict[str, Any]:
         """Find movies within a year range"""
         try:
-            section = plex_client.get_movie_library()
-            all_movies = section.all()
-            filtered = []
-            for movie in all_movies:
-                year = getattr(movie, 'year', None)
-                if year and start_year <= year <= end_year:
-                    filtered.append({
-                        "title": movie.title,
-                        "year": year,
-                        "rating": getattr(movie, 'rating', None),
-                        "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                        "directors": [d.tag for d in getattr(movie, 'directors', [])]
-                    })
-                    if len(filtered) >= limit:
-                        break
+            index = plex_client.peek_movie_index()
+            if index is not None:
+                movies = [index.movies[i] for i in index.year_range_ids(start_year, end_year)[:limit]]
+            else:
+                # Cold cache: let Plex filter by year server-side
+                section = plex_client.get_movie_library()
+                # Plex's >> and << are strict, so widen by a year to keep both ends
+                movies = section.search(
+                    filters={'year>>': start_year - 1, 'year<<': end_year + 1},
+                    sort='year:asc',
+                    maxresults=limit,
+                    **LIGHT_SEARCH_ARGS
+                )
+            
+            filtered = [MovieTools._serialize_movie(m, index) for m in movies]
             
             return {
                 "movies": filtered,
@@ -292,14 +281,8 @@ class MovieTools:
     def get_all_genres() -> Dict[str, Any]:
         """Get all available genres in the library"""
         try:
-            section = plex_client.get_movie_library()
-            genres = set()
-            all_movies = section.all()
-            for movie in all_movies:
-                for genre in getattr(movie, 'genres', []):
-                    genres.add(genre.tag)
-            
-            return {"genres": sorted(list(genres))}
+            index = plex_client.get_movie_index_cached()
+            return {"genres": sorted(index.genres.names)}
         except Exception as e:
             logger.error(f"Error getting genres: {e}")
             return {"error": str(e)}
@@ -308,14 +291,8 @@ class MovieTools:
     def get_all_directors() -> Dict[str, Any]:
         """Get all directors in the library"""
         try:
-            section = plex_client.get_movie_library()
-            directors = set()
-            all_movies = section.all()
-            for movie in all_movies:
-                for director in getattr(movie, 'directors', []):
-                    directors.add(director.tag)
-            
-            return {"directors": sorted(list(directors))}
+            index = plex_client.get_movie_index_cached()
+            return {"directors": sorted(index.directors.names)}
         except Exception as e:
             logger.error(f"Error getting directors: {e}")
             return {"error": str(e)}
@@ -326,17 +303,16 @@ class MovieTools:
         try:
             section = plex_client.get_movie_library()
             recent = section.recentlyAdded(maxresults=limit)
-            movies = []
             
+            # Refresh cached listings if something was added since they were fetched
+            if recent and getattr(recent[0], 'addedAt', None):
+                plex_client.invalidate_movie_cache(recent[0].addedAt)
+            
+            index = plex_client.peek_movie_index()
+            movies = []
             for movie in recent:
-                movies.append({
-                    "title": movie.title,
-                    "year": getattr(movie, 'year', None),
-                    "added_at": str(movie.addedAt) if hasattr(movie, 'addedAt') else None,
-                    "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                    "directors": [d.tag for d in getattr(movie, 'directors', [])],
-                    "summary": MovieTools._truncate_summary(getattr(movie, 'summary', ''))
-                })
+                details = MovieTools._serialize_movie(movie, index, 150)
+                movies.append({**details, "added_at": movie.addedAt.isoformat() if movie.__dict__.get('addedAt') else None})
             
             return {"recent_movies": movies}
         except Exception as e:
@@ -347,37 +323,17 @@ class MovieTools:
     def get_library_stats() -> Dict[str, Any]:
         """Get overall library statistics"""
         try:
-            section = plex_client.get_movie_library()
-            all_movies = section.all()
-            total_movies = len(all_movies)
-            
-            # Count by decade
-            decades = {}
-            genres = {}
-            directors = {}
-            
-            for movie in all_movies:
-                # Decade analysis
-                year = getattr(movie, 'year', None)
-                if year:
-                    decade = (year // 10) * 10
-                    decades[f"{decade}s"] = decades.get(f"{decade}s", 0) + 1
-                
-                # Genre analysis
-                for genre in getattr(movie, 'genres', []):
-                    genres[genre.tag] = genres.get(genre.tag, 0) + 1
-                
-                # Director analysis
-                for director in getattr(movie, 'directors', []):
-                    directors[director.tag] = directors.get(director.tag, 0) + 1
+            index = plex_client.get_movie_index_cached()
+            total_movies = len(index.movies)
             
-            # Top 10 of each
-            top_genres = sorted(genres.items(), key=lambda x: x[1], reverse=True)[:10]
-            top_directors = sorted(directors.items(), key=lambda x: x[1], reverse=True)[:10]
+            # Decade, genre and director counts are precomputed on the index;
+            # most_common(n) picks the top n with heapq.nlargest, not a full sort
+            top_genres = index.genre_counts.most_common(10)
+            top_directors = index.director_counts.most_common(10)
             
             return {
                 "total_movies": total_movies,
-                "decades": decades,
+                "decades": dict(index.decade_counts),
                 "top_genres": top_genres,
                 "top_directors": top_directors
             }
@@ -385,6 +341,56 @@ class MovieTools:
             logger.error(f"Error getting library stats: {e}")
             return {"error": str(e)}
     
+    @staticmethod
+    def _search_by_tag(section, table, field: str, name: str, limit: int) -> list:
+        """Find movies in ``section`` carrying a genre/director/actor tag
+        
+        section.search() validates every tag filter by downloading all filter
+        choices for the field (e.g. every actor in the library). When the
+        cached index knows the tag's Plex id, query the listing directly.
+        """
+        tag_id = table.plex_id(name) if table else None
+        if tag_id is None:
+            return section.search(limit=limit, **{field: name}, **LIGHT_SEARCH_ARGS)
+        # Plex takes the listing flags as 0/1, the way section.search sends them
+        params = {'type': utils.searchType('movie'), field: tag_id}
+        params.update((key, int(value)) for key, value in LIGHT_SEARCH_ARGS.items())
+        return section.fetchItems(f'/library/sections/{section.key}/all?{urlencode(params)}', maxresults=limit)
+    
+    @staticmethod
+    def _serialize_movie(movie, index=None, summary_len: int = 0) -> Dict[str, Any]:
+        """Format a movie, memoized by ratingKey when it is the cached index's own object
+        
+        The returned dict may be shared between calls and must not be mutated.
+        """
+        # Search results are separate (often partial) objects whose tags can
+        # differ from the indexed movie's, so only the index's movies are memoized
+        position = index.positions.get(movie.ratingKey) if index is not None else None
+        if position is None or index.movies[position] is not movie:
+            return MovieTools._movie_to_dict(movie, summary_len=summary_len)
+        key = (movie.ratingKey, summary_len)
+        details = index.serialized.get(key)
+        if details is None:
+            details = index.serialized[key] = MovieTools._movie_to_dict(movie, summary_len=summary_len)
+        return details
+    
+    @staticmethod
+    def _movie_to_dict(movie, *, summary_len: int = 0) -> Dict[str, Any]:
+        """Format the common movie fields, plus a truncated summary if summary_len is set"""
+        # Read loaded attributes directly; getattr on a partial plexapi object
+        # triggers a full reload whenever the value is None or empty
+        attrs = movie.__dict__
+        result = {
+            "title": movie.title,
+            "year": attrs.get('year'),
+            "rating": attrs.get('rating'),
+            "genres": list(map(_get_tag, attrs.get('genres') or ())),
+            "directors": list(map(_get_tag, attrs.get('directors') or ()))
+        }
+        if summary_len:
+            result["summary"] = MovieTools._truncate_summary(attrs.get('summary', ''), summary_len)
+        return result
+    
     @staticmethod
     def _truncate_summary(summary: str, max_length: int = 150) -> str:
         """Truncate summary text"""
@@ -404,21 +410,27 @@ class MovieTools:
             
             movie = results[0]
             
+            # Load the full metadata up front, then read attributes directly so
+            # none of the lookups below goes through plexapi's lazy-reload check
+            if not movie.isFullObject():
+                movie.reload()
+            attrs = movie.__dict__
+            
             # Get detailed metadata
             details = {
                 "title": movie.title,
-                "year": getattr(movie, 'year', None),
-                "rating": getattr(movie, 'rating', None),
-                "duration": getattr(movie, 'duration', None),
-                "summary": getattr(movie, 'summary', ''),
-                "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                "directors": [d.tag for d in getattr(movie, 'directors', [])],
-                "writers": [w.tag for w in getattr(movie, 'writers', [])],
-                "actors": [{"name": a.tag, "role": getattr(a, 'role', '')} for a in getattr(movie, 'roles', [])[:10]],  # Top 10 actors
-                "countries": [c.tag for c in getattr(movie, 'countries', [])],
-                "studio": getattr(movie, 'studio', None),
-                "content_rating": getattr(movie, 'contentRating', None),
-                "tags": [t.tag for t in getattr(movie, 'tags', [])]
+                "year": attrs.get('year'),
+                "rating": attrs.get('rating'),
+                "duration": attrs.get('duration'),
+                "summary": attrs.get('summary', ''),
+                "genres": list(map(_get_tag, attrs.get('genres') or ())),
+                "directors": list(map(_get_tag, attrs.get('directors') or ())),
+                "writers": list(map(_get_tag, attrs.get('writers') or ())),
+                "actors": [{"name": a.tag, "role": a.role or ''} for a in (attrs.get('roles') or ())[:10]],  # Top 10 actors
+                "countries": list(map(_get_tag, attrs.get('countries') or ())),
+                "studio": attrs.get('studio'),
+                "content_rating": attrs.get('contentRating'),
+                "tags": list(map(_get_tag, attrs.get('tags') or ()))
             }
             
             return {"movie_details": details}
@@ -431,22 +443,26 @@ class MovieTools:
         """Find movies featuring a specific actor"""
         try:
             section = plex_client.get_movie_library()
-            results = section.search(actor=actor_name, limit=limit)
+            index = plex_client.peek_movie_index()
+            results = MovieTools._search_by_tag(section, index and index.actors, 'actor', actor_name, limit)
             movies = []
+            needle = actor_name.casefold()
             
             for movie in results:
+                attrs = movie.__dict__
+                
                 # Get the actor's role in this movie
                 actor_role = ""
-                for role in getattr(movie, 'roles', []):
-                    if actor_name.lower() in role.tag.lower():
-                        actor_role = getattr(role, 'role', '')
+                for role in movie.roles:
+                    if needle in role.tag.casefold():
+                        actor_role = role.role or ''
                         break
                 
                 movies.append({
                     "title": movie.title,
-                    "year": getattr(movie, 'year', None),
-                    "rating": getattr(movie, 'rating', None),
-                    "genres": [g.tag for g in getattr(movie, 'genres', [])],
+                    "year": attrs.get('year'),
+                    "rating": attrs.get('rating'),
+                    "genres": list(map(_get_tag, attrs.get('genres') or ())),
                     "actor_role": actor_role
                 })
             
@@ -462,155 +478,175 @@ class MovieTools:
             similarity_factors = ["genres", "directors", "actors", "decade"]
         
         try:
-            # Get details of the reference movie
-            ref_details = MovieTools.get_movie_details(reference_movie)
-            if "error" in ref_details:
-                return ref_details
+            index = plex_client.get_movie_index_cached()
             
-            ref_data = ref_details["movie_details"]
-            section = plex_client.get_movie_library()
+            # Resolve the reference movie to its row in the cached index,
+            # falling back to Plex's title search for inexact titles
+            ref_idx = index.title_index.get(reference_movie.casefold())
+            if ref_idx is None:
+                results = plex_client.get_movie_library().search(title=reference_movie, limit=1)
+                if results:
+                    ref_idx = index.positions.get(results[0].ratingKey)
+            if ref_idx is None:
+                return {"error": f"Movie '{reference_movie}' not found"}
             
-            # Get all movies to compare against
-            all_movies = section.all()
-            similar_movies = []
+            # Listings only carry the first few billed roles, so take the
+            # reference's tags from its full metadata (one request unless
+            # already prefetched); tags no other movie has are skipped
+            ref_movie = index.movies[ref_idx]
+            if not ref_movie.isFullObject():
+                ref_movie = plex_client.server.fetchItem(ref_movie.ratingKey)
+            ref_attrs = ref_movie.__dict__
             
-            for movie in all_movies:
-                if movie.title.lower() == reference_movie.lower():
-                    continue  # Skip the reference movie itself
-                
-                similarity_score = 0
-                similarity_reasons = []
-                
-                # Genre similarity
-                if "genres" in similarity_factors:
-                    movie_genres = [g.tag for g in getattr(movie, 'genres', [])]
-                    genre_overlap = set(ref_data["genres"]) & set(movie_genres)
-                    if genre_overlap:
-                        similarity_score += len(genre_overlap) * 2
-                        similarity_reasons.append(f"Shared genres: {', '.join(genre_overlap)}")
-                
-                # Director similarity
-                if "directors" in similarity_factors:
-                    movie_directors = [d.tag for d in getattr(movie, 'directors', [])]
-                    director_overlap = set(ref_data["directors"]) & set(movie_directors)
-                    if director_overlap:
-                        similarity_score += len(director_overlap) * 3
-                        similarity_reasons.append(f"Shared directors: {', '.join(director_overlap)}")
-                
-                # Actor similarity
-                if "actors" in similarity_factors:
-                    movie_actors = [a.tag for a in getattr(movie, 'roles', [])]
-                    ref_actors = [a["name"] for a in ref_data["actors"]]
-                    actor_overlap = set(ref_actors) & set(movie_actors)
-                    if actor_overlap:
-                        similarity_score += len(actor_overlap)
-                        similarity_reasons.append(f"Shared actors: {', '.join(list(actor_overlap)[:3])}")
-                
-                # Decade similarity
-                if "decade" in similarity_factors:
-                    ref_year = ref_data.get("year")
-                    movie_year = getattr(movie, 'year', None)
-                    if ref_year and movie_year:
-                        ref_decade = (ref_year // 10) * 10
-                        movie_decade = (movie_year // 10) * 10
-                        if ref_decade == movie_decade:
-                            similarity_score += 1
-                            similarity_reasons.append(f"Same decade ({movie_decade}s)")
-                
-                # Only include movies with some similarity
-                if similarity_score > 0:
-                    similar_movies.append({
-                        "title": movie.title,
-                        "year": getattr(movie, 'year', None),
-                        "rating": getattr(movie, 'rating', None),
-                        "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                        "similarity_score": similarity_score,
-                        "similarity_reasons": similarity_reasons
-                    })
-            
-            # Sort by similarity score
-            similar_movies.sort(key=lambda x: x["similarity_score"], reverse=True)
+            # Reference tag sets are invariant for the whole call
+            ref_genre_ids = MovieTools._tag_ids(index.genres, ref_attrs.get('genres'))
+            ref_director_ids = MovieTools._tag_ids(index.directors, ref_attrs.get('directors'))
+            ref_actor_ids = MovieTools._tag_ids(index.actors, (ref_attrs.get('roles') or ())[:10])  # Top 10 actors
+            ref_year = index.year(ref_idx)
+            ref_decade = (ref_year // 10) * 10 if ref_year else None
+            
+            # Score only movies that share something with the reference by
+            # walking its posting lists. Counter.update counts an iterable in
+            # C, so a weight of w is applied as w updates.
+            scores = Counter()
+            weighted_postings = []
+            if "genres" in similarity_factors:
+                weighted_postings += [(index.genres.postings[g], 2) for g in ref_genre_ids]
+            if "directors" in similarity_factors:
+                weighted_postings += [(index.directors.postings[d], 3) for d in ref_director_ids]
+            if "actors" in similarity_factors:
+                weighted_postings += [(index.actors.postings[a], 1) for a in ref_actor_ids]
+            if "decade" in similarity_factors and ref_decade is not None:
+                weighted_postings.append((index.decade_index.get(ref_decade, ()), 1))
+            for postings, weight in weighted_postings:
+                for _ in range(weight):
+                    scores.update(postings)
+            
+            # Skip the reference movie itself
+            scores.pop(ref_idx, None)
+            
+            # Top 20 most similar: highest score first, library order within a score
+            ranked = heapq.nlargest(20, scores, key=lambda i: (scores[i], -i))
+            similar_movies = [
+                MovieTools._similarity_details(
+                    index, i, scores[i], similarity_factors,
+                    ref_genre_ids, ref_director_ids, ref_actor_ids, ref_decade
+                )
+                for i in ranked
+            ]
             
             return {
                 "reference_movie": reference_movie,
-                "similar_movies": similar_movies[:20],  # Top 20 most similar
+                "similar_movies": similar_movies,
                 "similarity_factors": similarity_factors,
-                "total_found": len(similar_movies)
+                "total_found": len(scores)
             }
         
         except Exception as e:
             logger.error(f"Error finding similar movies: {e}")
             return {"error": str(e)}
 
+    @staticmethod
+    def _tag_ids(table, tags) -> frozenset:
+        """Ids in ``table`` of the given plexapi tags, skipping unknown ones"""
+        ids = table.ids
+        return frozenset(ids[key] for key in (tag.tag.casefold() for tag in tags or ()) if key in ids)
+    
+    @staticmethod
+    def _similarity_details(index, i: int, score: int, similarity_factors: List[str],
+                            ref_genre_ids, ref_director_ids, ref_actor_ids, ref_decade) -> Dict[str, Any]:
+        """Format a similar movie with the reasons behind its score"""
+        genre_names = index.genres.names
+        similarity_reasons = []
+        
+        if "genres" in similarity_factors:
+            genre_overlap = ref_genre_ids.intersection(index.genres.rows[i])
+            if genre_overlap:
+                similarity_reasons.append(f"Shared genres: {', '.join(genre_names[g] for g in genre_overlap)}")
+        
+        if "directors" in similarity_factors:
+            director_overlap = ref_director_ids.intersection(index.directors.rows[i])
+            if director_overlap:
+                director_names = index.directors.names
+                similarity_reasons.append(f"Shared directors: {', '.join(director_names[d] for d in director_overlap)}")
+        
+        if "actors" in similarity_factors:
+            actor_overlap = ref_actor_ids.intersection(index.actors.rows[i])
+            if actor_overlap:
+                actor_names = index.actors.names
+                similarity_reasons.append(f"Shared actors: {', '.join([actor_names[a] for a in actor_overlap][:3])}")
+        
+        if "decade" in similarity_factors and ref_decade is not None and i in index.decade_index.get(ref_decade, ()):
+            similarity_reasons.append(f"Same decade ({ref_decade}s)")
+        
+        return {
+            "title": index.titles[i],
+            "year": index.year(i),
+            "rating": index.ratings[i],
+            "genres": [genre_names[g] for g in index.genres.rows[i]],
+            "similarity_score": score,
+            "similarity_reasons": similarity_reasons
+        }
+
     @staticmethod
     def search_multi_criteria(genres: List[str] = None, directors: List[str] = None, 
                             actors: List[str] = None, year_range: tuple = None, 
                             min_rating: float = None, limit: int = 30) -> Dict[str, Any]:
         """Search movies using multiple criteria simultaneously"""
         try:
-            section = plex_client.get_movie_library()
-            all_movies = section.all()
-            matching_movies = []
+            index = plex_client.get_movie_index_cached()
+            
+            # Each criterion matches movies carrying any of its values; intersect
+            # the per-criterion posting sets so only full matches are visited
+            # Casefold and look up each requested value once, up front
+            genre_postings = [(g, index.genres.lookup(g)) for g in genres or ()]
+            director_postings = [(d, index.directors.lookup(d)) for d in directors or ()]
+            actor_postings = [(a, index.actors.lookup(a)) for a in actors or ()]
+            
+            postings = []
+            if genres:
+                postings.append(set().union(*(ids for _, ids in genre_postings)))
+            if directors:
+                postings.append(set().union(*(ids for _, ids in director_postings)))
+            if actors:
+                postings.append(set().union(*(ids for _, ids in actor_postings)))
+            if year_range:
+                postings.append(set(index.year_range_ids(year_range[0], year_range[1])))
             
-            for movie in all_movies:
-                matches = True
+            if postings:
+                # Intersect the most selective criterion first so every
+                # intermediate set stays as small as possible
+                postings.sort(key=len)
+                candidates = sorted(functools.reduce(operator.and_, postings))
+            else:
+                candidates = range(len(index.movies))
+            
+            # Rating filter over the ratings column
+            if min_rating:
+                ratings = index.ratings
+                candidates = [i for i in candidates if ratings[i] and ratings[i] >= min_rating]
+            
+            # Every remaining candidate matches; only format the first `limit`
+            matching_movies = []
+            for i in candidates[:limit]:
                 match_reasons = []
                 
-                # Genre filter
                 if genres:
-                    movie_genres = [g.tag.lower() for g in getattr(movie, 'genres', [])]
-                    genre_matches = [g for g in genres if g.lower() in movie_genres]
-                    if not genre_matches:
-                        matches = False
-                    else:
-                        match_reasons.append(f"Genres: {', '.join(genre_matches)}")
-                
-                # Director filter
-                if directors and matches:
-                    movie_directors = [d.tag.lower() for d in getattr(movie, 'directors', [])]
-                    director_matches = [d for d in directors if d.lower() in movie_directors]
-                    if not director_matches:
-                        matches = False
-                    else:
-                        match_reasons.append(f"Directors: {', '.join(director_matches)}")
-                
-                # Actor filter
-                if actors and matches:
-                    movie_actors = [a.tag.lower() for a in getattr(movie, 'roles', [])]
-                    actor_matches = [a for a in actors if a.lower() in movie_actors]
-                    if not actor_matches:
-                        matches = False
-                    else:
-                        match_reasons.append(f"Actors: {', '.join(actor_matches)}")
+                    genre_matches = [g for g, ids in genre_postings if i in ids]
+                    match_reasons.append(f"Genres: {', '.join(genre_matches)}")
+                if directors:
+                    director_matches = [d for d, ids in director_postings if i in ids]
+                    match_reasons.append(f"Directors: {', '.join(director_matches)}")
+                if actors:
+                    actor_matches = [a for a, ids in actor_postings if i in ids]
+                    match_reasons.append(f"Actors: {', '.join(actor_matches)}")
+                if year_range:
+                    match_reasons.append(f"Year: {index.years[i]}")
+                if min_rating:
+                    match_reasons.append(f"Rating: {index.ratings[i]}")
                 
-                # Year range filter
-                if year_range and matches:
-                    movie_year = getattr(movie, 'year', None)
-                    if not movie_year or not (year_range[0] <= movie_year <= year_range[1]):
-                        matches = False
-                    else:
-                        match_reasons.append(f"Year: {movie_year}")
-                
-                # Rating filter
-                if min_rating and matches:
-                    movie_rating = getattr(movie, 'rating', None)
-                    if not movie_rating or movie_rating < min_rating:
-                        matches = False
-                    else:
-                        match_reasons.append(f"Rating: {movie_rating}")
-                
-                if matches:
-                    matching_movies.append({
-                        "title": movie.title,
-                        "year": getattr(movie, 'year', None),
-                        "rating": getattr(movie, 'rating', None),
-                        "genres": [g.tag for g in getattr(movie, 'genres', [])],
-                        "directors": [d.tag for d in getattr(movie, 'directors', [])],
-                        "match_reasons": match_reasons
-                    })
-                    
-                    if len(matching_movies) >= limit:
-                        break
+                details = MovieTools._serialize_movie(index.movies[i], index)
+                matching_movies.append({**details, "match_reasons": match_reasons})
             
             return {
                 "movies": matching_movies,
@@ -632,41 +668,37 @@ class MovieTools:
     def get_genre_combinations(limit: int = 20) -> Dict[str, Any]:
         """Get movies grouped by genre combinations to understand library patterns"""
         try:
-            section = plex_client.get_movie_library()
-            all_movies = section.all()
-            genre_combos = {}
-            
-            for movie in all_movies:
-                genres = [g.tag for g in getattr(movie, 'genres', [])]
-                if len(genres) > 1:
-                    # Sort genres to normalize combinations
-                    combo = " + ".join(sorted(genres))
-                    if combo not in genre_combos:
-                        genre_combos[combo] = []
-                    
-                    genre_combos[combo].append({
-                        "title": movie.title,
-                        "year": getattr(movie, 'year', None),
-                        "rating": getattr(movie, 'rating', None)
-                    })
+            index = plex_client.get_movie_index_cached()
+            genre_names = index.genres.names
+            
+            # Group movies by their genre set as an integer bitmask; the
+            # mask doubles as an order-independent key, so no per-movie
+            # sort/join of names is needed
+            genre_combos = defaultdict(list)
+            for i, mask in enumerate(index.genres.masks):
+                if mask & (mask - 1):  # More than one bit set
+                    genre_combos[mask].append(i)
             
             # Sort by number of movies in each combination
-            sorted_combos = sorted(
-                genre_combos.items(), 
-                key=lambda x: len(x[1]), 
-                reverse=True
-            )[:limit]
+            sorted_combos = heapq.nlargest(limit, genre_combos.items(), key=lambda x: len(x[1]))
             
-            return {
-                "genre_combinations": [
-                    {
-                        "genres": combo,
-                        "count": len(movies),
-                        "movies": movies[:5]  # Show first 5 movies as examples
-                    }
-                    for combo, movies in sorted_combos
-                ]
-            }
+            combinations = []
+            for mask, positions in sorted_combos:
+                genre_ids = index.genres.rows[positions[0]]
+                combinations.append({
+                    "genres": " + ".join(sorted(genre_names[g] for g in set(genre_ids))),
+                    "count": len(positions),
+                    "movies": [  # Show first 5 movies as examples
+                        {
+                            "title": index.titles[i],
+                            "year": index.year(i),
+                            "rating": index.ratings[i]
+                        }
+                        for i in positions[:5]
+                    ]
+                })
+            
+            return {"genre_combinations": combinations}
         
         except Exception as e:
             logger.error(f"Error getting genre combinations: {e}")